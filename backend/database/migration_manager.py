@@ -29,11 +29,11 @@ MIGRATIONS = [
     "fix_timestamp_bigint.py",
     "create_signal_system_tables.py",
     "add_wallet_address_to_snapshot_tables.py",
-    "add_wallet_address_to_hyperliquid_trades.py",
     "add_ai_signal_chat.py",
     "add_signal_pool_to_strategy.py",
     "add_logic_to_signal_pools.py",
     "fix_enabled_column_type.py",
+    "add_symbol_timestamp_indexes_to_market_flow_tables.py",
 ]
 
 
@@ -7,8 +7,9 @@ data from multiple exchanges (hyperliquid, binance, okx, etc.).
 
 Changes:
 1. Add 'exchange' column with default value 'hyperliquid'
-2. Update unique constraint to include exchange field
-3. Create index on exchange field for performance
+2. Update unique constraint to include exchange field (concurrent unique index,
+   then an atomic constraint swap)
+3. Create index on exchange field for performance (CONCURRENTLY, so writes are not blocked)
 """
 
 import sys
@@ -19,69 +20,92 @@ from sqlalchemy import text
 from connection import SessionLocal, engine
 
 
+def _drop_invalid_index(conn, index_name):
+    """Drop an invalid index left by a failed concurrent build, so IF NOT EXISTS doesn't skip the rebuild"""
+    invalid = conn.execute(text("""
+        SELECT 1 FROM pg_index
+        WHERE indexrelid = to_regclass(:index_name)
+        AND NOT indisvalid
+    """), {"index_name": index_name}).fetchone()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY {index_name}"))
+
+
 def upgrade():
     """Apply the migration (idempotent - safe to run multiple times)"""
     print("Starting migration: add_exchange_to_crypto_klines")
 
     db = SessionLocal()
     try:
-        # Step 1: Check if exchange column exists
-        result = db.execute(text("""
-            SELECT column_name FROM information_schema.columns
-            WHERE table_name = 'crypto_klines' AND column_name = 'exchange'
-        """))
-        exchange_exists = result.fetchone() is not None
-
+        # Step 1: Check current column and constraint state in one query
+        exchange_exists, constraint_exists = db.execute(text("""
+            SELECT
+                EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'crypto_klines' AND column_name = 'exchange'
+                ),
+                EXISTS (
+                    SELECT 1 FROM information_schema.table_constraints
+                    WHERE constraint_name = 'crypto_klines_exchange_symbol_market_period_timestamp_key'
+                    AND table_name = 'crypto_klines'
+                )
+        """)).fetchone()
+
+        # Step 2: Add exchange column
         if not exchange_exists:
-            # Add exchange column with default value
             print("Adding exchange column to crypto_klines table...")
             db.execute(text("""
                 ALTER TABLE crypto_klines
                 ADD COLUMN exchange VARCHAR(20) NOT NULL DEFAULT 'hyperliquid'
             """))
+            db.commit()
             print("  ✓ Exchange column added")
         else:
             print("  ✓ Exchange column already exists, skipping")
 
-        # Step 2: Create index on exchange field (idempotent)
-        print("Creating index on exchange field...")
-        db.execute(text("""
-            CREATE INDEX IF NOT EXISTS idx_crypto_klines_exchange ON crypto_klines(exchange)
-        """))
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
+    finally:
+        db.close()
 
-        # Step 3: Drop old unique constraint (idempotent)
-        print("Dropping old unique constraint...")
-        db.execute(text("""
-            ALTER TABLE crypto_klines
-            DROP CONSTRAINT IF EXISTS crypto_klines_symbol_market_period_timestamp_key
-        """))
+    # Indexes are built CONCURRENTLY so writes are not blocked.
+    # CONCURRENTLY cannot run inside a transaction block.
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
 
-        # Step 4: Create new unique constraint including exchange (idempotent)
-        print("Creating new unique constraint with exchange field...")
-        constraint_check = db.execute(text("""
-            SELECT COUNT(*) FROM information_schema.table_constraints
-            WHERE constraint_name = 'crypto_klines_exchange_symbol_market_period_timestamp_key'
-            AND table_name = 'crypto_klines'
+        # Step 3: Create index on exchange field
+        print("Creating index on exchange field...")
+        _drop_invalid_index(conn, "idx_crypto_klines_exchange")
+        conn.execute(text("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_crypto_klines_exchange ON crypto_klines(exchange)
         """))
-        if constraint_check.scalar() == 0:
-            db.execute(text("""
+
+        # Step 4: Replace the unique constraint with one including exchange.
+        # The new unique index is built concurrently while the old constraint
+        # still enforces uniqueness; then a single ALTER TABLE swaps the
+        # constraints atomically under one brief lock. If the build fails,
+        # the old constraint stays in place.
+        if not constraint_exists:
+            print("Creating new unique constraint with exchange field...")
+            _drop_invalid_index(conn, "uq_crypto_klines_exchange_symbol_market_period_timestamp")
+            conn.execute(text("""
+                CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS
+                uq_crypto_klines_exchange_symbol_market_period_timestamp
+                ON crypto_klines(exchange, symbol, market, period, timestamp)
+            """))
+            conn.execute(text("""
                 ALTER TABLE crypto_klines
+                DROP CONSTRAINT IF EXISTS crypto_klines_symbol_market_period_timestamp_key,
                 ADD CONSTRAINT crypto_klines_exchange_symbol_market_period_timestamp_key
-                UNIQUE (exchange, symbol, market, period, timestamp)
+                UNIQUE USING INDEX uq_crypto_klines_exchange_symbol_market_period_timestamp
             """))
-            print("  ✓ New unique constraint created")
+            print("  ✓ Unique constraint replaced")
         else:
             print("  ✓ Unique constraint already exists, skipping")
 
-        db.commit()
-        print("Migration completed successfully!")
-
-    except Exception as e:
-        db.rollback()
-        print(f"Migration failed: {e}")
-        raise
-    finally:
-        db.close()
+    print("Migration completed successfully!")
 
 
 def downgrade():
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Migration: Add (symbol, timestamp) composite indexes to market flow tables
+
+Market flow indicator queries filter on symbol and a timestamp range and
+order by timestamp. The existing unique constraints lead with exchange, so
+they cannot serve these lookups. A (symbol, timestamp) index turns them into
+ordered index range scans.
+
+Tables affected:
+- market_trades_aggregated
+- market_asset_metrics
+- market_orderbook_snapshots
+
+Indexes are built with CREATE INDEX CONCURRENTLY so collectors keep writing
+while they build. CONCURRENTLY cannot run inside a transaction, so the
+statements are issued on an AUTOCOMMIT connection.
+
+IDEMPOTENT: Safe to run multiple times (IF NOT EXISTS; invalid leftovers from
+an interrupted build are dropped and rebuilt).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import text
+from database.connection import engine
+
+INDEXES = [
+    ("idx_market_trades_agg_symbol_ts", "market_trades_aggregated"),
+    ("idx_market_asset_metrics_symbol_ts", "market_asset_metrics"),
+    ("idx_market_orderbook_snapshots_symbol_ts", "market_orderbook_snapshots"),
+]
+
+
+def _drop_invalid_index(conn, index_name):
+    """Drop an invalid index left by a failed concurrent build, so IF NOT EXISTS doesn't skip the rebuild"""
+    invalid = conn.execute(text("""
+        SELECT 1 FROM pg_index
+        WHERE indexrelid = to_regclass(:index_name)
+        AND NOT indisvalid
+    """), {"index_name": index_name}).fetchone()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY {index_name}"))
+
+
+def upgrade():
+    """Create composite (symbol, timestamp) indexes without blocking writes"""
+    print("Starting migration: add_symbol_timestamp_indexes_to_market_flow_tables")
+
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        for index_name, table in INDEXES:
+            exists = conn.execute(text("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.tables
+                    WHERE table_name = :table_name
+                )
+            """), {"table_name": table}).scalar()
+
+            if not exists:
+                print(f"Table {table} does not exist, skipping...")
+                continue
+
+            _drop_invalid_index(conn, index_name)
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                f"ON {table} (symbol, timestamp)"
+            ))
+            print(f"  ✓ Index {index_name} ready")
+
+    print("Migration add_symbol_timestamp_indexes_to_market_flow_tables completed successfully!")
+
+
+def downgrade():
+    """Drop the composite indexes"""
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+
+        for index_name, _ in INDEXES:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+    print("Rollback completed: market flow symbol/timestamp indexes dropped")
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -1,6 +1,10 @@
 """
 Add wallet_address column to hyperliquid_trades table in the snapshot DB.
 
+Deprecated: add_wallet_address_to_snapshot_tables.py now covers
+hyperliquid_trades as well, and migration_manager.py no longer runs this
+script. Kept for manual runs.
+
 Usage:
     cd /home/wwwroot/hyper-alpha-arena-prod/backend
     source .venv/bin/activate
@@ -9,31 +13,18 @@ Usage:
 import os
 import sys
 
-from sqlalchemy import inspect, text
-
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_ROOT = os.path.dirname(BASE_DIR)
 sys.path.insert(0, PROJECT_ROOT)
 
 from database.snapshot_connection import snapshot_engine  # noqa: E402
-
-
-def column_exists(inspector, table: str, column: str) -> bool:
-    return column in {col["name"] for col in inspector.get_columns(table)}
+from database.migrations.add_wallet_address_to_snapshot_tables import add_wallet_address  # noqa: E402
 
 
 def upgrade() -> None:
-    """Apply the migration - called by migration_manager.py"""
-    inspector = inspect(snapshot_engine)
-
-    with snapshot_engine.connect() as conn:
-        if not column_exists(inspector, "hyperliquid_trades", "wallet_address"):
-            conn.execute(text("ALTER TABLE hyperliquid_trades ADD COLUMN wallet_address VARCHAR(100)"))
-            print("✅ Added wallet_address to hyperliquid_trades")
-        else:
-            print("ℹ️  wallet_address already exists on hyperliquid_trades")
-
-        conn.commit()
+    """Apply the migration"""
+    with snapshot_engine.begin() as conn:
+        add_wallet_address(conn, ("hyperliquid_trades",))
 
 
 def main() -> None:
@@ -1,6 +1,11 @@
 """
 Migration script to add wallet_address column to Hyperliquid snapshot tables.
 
+Covers every snapshot DB table that needs the column
+(hyperliquid_account_snapshots and hyperliquid_trades) in one transaction.
+A single information_schema query finds the tables missing the column, so
+tables that already have it are not ALTERed (and not locked) on every start.
+
 Usage:
     cd /home/wwwroot/hyper-alpha-arena-prod/backend
     source .venv/bin/activate
@@ -9,7 +14,7 @@ Usage:
 import os
 import sys
 
-from sqlalchemy import inspect, text
+from sqlalchemy import text
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_ROOT = os.path.dirname(BASE_DIR)
@@ -17,26 +22,30 @@ sys.path.insert(0, PROJECT_ROOT)
 
 from database.snapshot_connection import snapshot_engine  # noqa: E402
 
+SNAPSHOT_TABLES = ("hyperliquid_account_snapshots", "hyperliquid_trades")
+
+
+def add_wallet_address(conn, tables) -> None:
+    """Add wallet_address to the given snapshot tables that are missing it"""
+    present = set(conn.execute(text("""
+        SELECT table_name FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        AND table_name = ANY(:tables)
+        AND column_name = 'wallet_address'
+    """), {"tables": list(tables)}).scalars())
 
-def column_exists(inspector, table: str, column: str) -> bool:
-    columns = [col["name"] for col in inspector.get_columns(table)]
-    return column in columns
+    for table in tables:
+        if table in present:
+            print(f"ℹ️  wallet_address already exists on snapshot {table}")
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN wallet_address VARCHAR(100)"))
+        print(f"✅ Added wallet_address to snapshot {table}")
 
 
 def upgrade():
     """Apply the migration - called by migration_manager.py"""
-    inspector = inspect(snapshot_engine)
-
-    with snapshot_engine.connect() as conn:
-        if not column_exists(inspector, "hyperliquid_account_snapshots", "wallet_address"):
-            conn.execute(
-                text("ALTER TABLE hyperliquid_account_snapshots ADD COLUMN wallet_address VARCHAR(100)")
-            )
-            print("✅ Added wallet_address to snapshot hyperliquid_account_snapshots")
-        else:
-            print("ℹ️  wallet_address already exists on snapshot hyperliquid_account_snapshots")
-
-        conn.commit()
+    with snapshot_engine.begin() as conn:
+        add_wallet_address(conn, SNAPSHOT_TABLES)
 
 
 def main():
@@ -16,11 +16,18 @@ Supported variables:
 - {SYMBOL}_DEPTH_{PERIOD} - Order Book Depth Ratio
 """
 
+import copy
 import logging
-from decimal import Decimal
-from typing import Dict, Any, List, Optional
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from threading import Lock
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import BigInteger, Float, bindparam, cast, func, select, text
 
 from database.models import (
     MarketTradesAggregated,
@@ -42,17 +49,59 @@ TIMEFRAME_MS = {
     "4h": 4 * 60 * 60 * 1000,
 }
 
+# Number of periods looked back from current time
+LOOKBACK_PERIODS = 10
+# A lookback window that is not bucket-aligned touches one extra partial bucket
+MAX_BUCKETS = LOOKBACK_PERIODS + 1
+
+# Source table backing each indicator; indicators sharing a table share one query
+INDICATOR_TABLES = {
+    "CVD": "trades",
+    "TAKER": "trades",
+    "OI": "metrics",
+    "OI_DELTA": "metrics",
+    "FUNDING": "metrics",
+    "DEPTH": "orderbook",
+    "IMBALANCE": "orderbook",
+}
+_SUPPORTED = frozenset(INDICATOR_TABLES)
+
+# Field of each indicator's data dict returned by get_indicator_value
+_VALUE_FIELDS = {
+    "CVD": "current",
+    "TAKER": "ratio",
+    "OI": "current",
+    "OI_DELTA": "current",
+    "FUNDING": "current",
+    "DEPTH": "ratio",
+    "IMBALANCE": "current",
+}
+
+# Upper bound for each flow source query, so a slow scan can't stall prompt building
+FLOW_QUERY_TIMEOUT_MS = 2000
+
+# Short-lived cache for live prompt flow data. Results are deep-copied in and
+# out, so callers may mutate what they get back.
+# key: (symbol, period, indicators, bucket_ts), value: (expires_at, results)
+PROMPT_CACHE_MAX_SIZE = 1024
+PROMPT_CACHE_MAX_TTL_SECONDS = 60
+_prompt_cache: Dict[Tuple[str, str, Tuple[str, ...], int], Tuple[float, Dict[str, Any]]] = {}
+_prompt_cache_lock = Lock()
+
 
 def floor_timestamp(ts_ms: int, interval_ms: int) -> int:
     """Floor timestamp to interval boundary"""
     return (ts_ms // interval_ms) * interval_ms
 
 
-def decimal_to_float(val) -> Optional[float]:
-    """Convert Decimal to float, handling None"""
-    if val is None:
-        return None
-    return float(val)
+def _bucket_expr(column, interval_ms):
+    """SQL expression flooring a millisecond timestamp column to interval boundary"""
+    return ((column // interval_ms) * interval_ms).label("bucket")
+
+
+def _float_array(values) -> np.ndarray:
+    """Build a float64 array from float column values, mapping NULL to NaN"""
+    return np.fromiter(values, dtype=np.float64)
 
 
 def format_volume(value: float) -> str:
@@ -105,57 +154,73 @@ def get_indicator_value(
     interval_ms = TIMEFRAME_MS[period]
 
     if current_time_ms is None:
-        from datetime import datetime
         current_time_ms = int(datetime.utcnow().timestamp() * 1000)
 
+    symbol = symbol.upper()
     indicator_upper = indicator.upper()
 
+    handler = _DISPATCH.get(indicator_upper)
+    if handler is None:
+        logger.warning(f"Unknown indicator: {indicator}")
+        return None
+
     try:
-        if indicator_upper == "OI_DELTA":
-            data = _get_oi_delta_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("current") if data else None
-        elif indicator_upper == "CVD":
-            data = _get_cvd_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("current") if data else None
-        elif indicator_upper == "DEPTH":
-            data = _get_depth_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("ratio") if data else None
-        elif indicator_upper == "IMBALANCE":
-            data = _get_imbalance_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("current") if data else None
-        elif indicator_upper == "TAKER":
-            data = _get_taker_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("ratio") if data else None
-        elif indicator_upper == "OI":
-            data = _get_oi_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("current") if data else None
-        elif indicator_upper == "FUNDING":
-            data = _get_funding_data(db, symbol, period, interval_ms, current_time_ms)
-            return data.get("current") if data else None
-        else:
-            logger.warning(f"Unknown indicator: {indicator}")
-            return None
+        data = handler(db, symbol, period, interval_ms, current_time_ms)
+        return data.get(_VALUE_FIELDS[indicator_upper]) if data else None
     except Exception as e:
         logger.error(f"Error getting indicator {indicator} for {symbol}: {e}")
         return None
 
 
+def _get_cached_prompt_flow(key: Tuple) -> Optional[Dict[str, Any]]:
+    """Return cached prompt flow results if still within TTL"""
+    with _prompt_cache_lock:
+        entry = _prompt_cache.get(key)
+        if not entry:
+            return None
+
+        expires_at, results = entry
+        if time.time() < expires_at:
+            return copy.deepcopy(results)
+
+        del _prompt_cache[key]
+        return None
+
+
+def _set_cached_prompt_flow(key: Tuple, results: Dict[str, Any], ttl_seconds: float) -> None:
+    """Store prompt flow results, evicting expired then oldest entries when full"""
+    now = time.time()
+    with _prompt_cache_lock:
+        if len(_prompt_cache) >= PROMPT_CACHE_MAX_SIZE:
+            for cache_key in [k for k, (exp, _) in _prompt_cache.items() if exp <= now]:
+                del _prompt_cache[cache_key]
+            while len(_prompt_cache) >= PROMPT_CACHE_MAX_SIZE:
+                del _prompt_cache[next(iter(_prompt_cache))]
+        _prompt_cache[key] = (now + ttl_seconds, copy.deepcopy(results))
+
+
 def get_flow_indicators_for_prompt(
     db: Session,
     symbol: str,
     period: str,
     indicators: List[str],
-    current_time_ms: Optional[int] = None
+    current_time_ms: Optional[int] = None,
+    bypass_cache: bool = False
 ) -> Dict[str, Any]:
     """
     Get market flow indicator data formatted for AI prompt injection.
 
+    Live calls (no current_time_ms) are cached per symbol, period, indicator
+    set and period bucket for half a period, capped at
+    PROMPT_CACHE_MAX_TTL_SECONDS.
+
     Args:
         db: Database session
         symbol: Trading symbol (e.g., "BTC")
         period: Time period (e.g., "15m", "1h")
         indicators: List of indicators to calculate ["CVD", "TAKER", "OI", "FUNDING", "DEPTH"]
         current_time_ms: Current timestamp in ms (defaults to now)
+        bypass_cache: Always query the database and skip the result cache
 
     Returns:
         Dict with indicator name as key and raw data dict as value
@@ -164,63 +229,234 @@ def get_flow_indicators_for_prompt(
         logger.warning(f"Unsupported period: {period}")
         return {}
 
+    requested = {i.upper() for i in indicators}
+    if not _SUPPORTED.intersection(requested):
+        logger.warning(f"No supported flow indicators requested: {indicators}")
+        return {}
+
     interval_ms = TIMEFRAME_MS[period]
+    use_cache = current_time_ms is None and not bypass_cache
 
     if current_time_ms is None:
-        from datetime import datetime
         current_time_ms = int(datetime.utcnow().timestamp() * 1000)
 
+    symbol = symbol.upper()
+
+    if use_cache:
+        cache_key = (
+            symbol,
+            period,
+            tuple(sorted(requested)),
+            floor_timestamp(current_time_ms, interval_ms),
+        )
+        cached = _get_cached_prompt_flow(cache_key)
+        if cached is not None:
+            return cached
+
+    # Fetch each source table once, no matter how many indicators read it,
+    # from one read-only snapshot so all indicators see consistent data
+    tables = {INDICATOR_TABLES[i] for i in requested & _SUPPORTED}
+    prefetched = {}
+    failed_tables = set()
+    try:
+        with _read_only_snapshot(db) as conn:
+            for table in sorted(tables):
+                # Savepoint per table, so a failed query (e.g. statement
+                # timeout) only loses that table's indicators
+                try:
+                    with conn.begin_nested():
+                        prefetched[table] = _query_table(conn, table, symbol, interval_ms, current_time_ms)
+                except Exception as e:
+                    logger.error(f"Error querying flow {table} data for {symbol}: {e}")
+                    failed_tables.add(table)
+    except Exception as e:
+        logger.error(f"Error querying flow data for {symbol}: {e}")
+        failed_tables = tables - prefetched.keys()
+
+    if failed_tables:
+        use_cache = False
+
+    # CVD and TAKER both read the trade buckets; convert them to arrays once
+    if "trades" in prefetched:
+        prefetched["trade_arrays"] = _trade_arrays(prefetched["trades"])
+
     results = {}
 
     for indicator in indicators:
         indicator_upper = indicator.upper()
+        if INDICATOR_TABLES.get(indicator_upper) in failed_tables:
+            results[indicator_upper] = None
+            continue
+        handler = _DISPATCH.get(indicator_upper)
+        if handler is None:
+            logger.warning(f"Unknown flow indicator: {indicator}")
+            continue
         try:
-            if indicator_upper == "CVD":
-                results["CVD"] = _get_cvd_data(db, symbol, period, interval_ms, current_time_ms)
-            elif indicator_upper == "TAKER":
-                results["TAKER"] = _get_taker_data(db, symbol, period, interval_ms, current_time_ms)
-            elif indicator_upper == "OI":
-                results["OI"] = _get_oi_data(db, symbol, period, interval_ms, current_time_ms)
-            elif indicator_upper == "OI_DELTA":
-                results["OI_DELTA"] = _get_oi_delta_data(db, symbol, period, interval_ms, current_time_ms)
-            elif indicator_upper == "FUNDING":
-                results["FUNDING"] = _get_funding_data(db, symbol, period, interval_ms, current_time_ms)
-            elif indicator_upper == "DEPTH":
-                results["DEPTH"] = _get_depth_data(db, symbol, period, interval_ms, current_time_ms)
-            elif indicator_upper == "IMBALANCE":
-                results["IMBALANCE"] = _get_imbalance_data(db, symbol, period, interval_ms, current_time_ms)
-            else:
-                logger.warning(f"Unknown flow indicator: {indicator}")
+            results[indicator_upper] = handler(db, symbol, period, interval_ms, current_time_ms, prefetched)
         except Exception as e:
             logger.error(f"Error calculating flow indicator {indicator}: {e}")
             results[indicator_upper] = None
+            use_cache = False
+
+    # Don't cache failures, so the next call retries the database
+    if use_cache:
+        ttl_seconds = min(interval_ms / 1000 / 2, PROMPT_CACHE_MAX_TTL_SECONDS)
+        _set_cached_prompt_flow(cache_key, results, ttl_seconds)
 
     return results
 
 
+# Source statements are built once at import time with bind parameters, so
+# each call only binds values and reuses SQLAlchemy's compiled form.
+# Source queries and _get_*_data helpers expect an already uppercased symbol.
+_INTERVAL_MS = bindparam("interval_ms", type_=BigInteger)
+
+
+def _source_filter(model):
+    """Symbol and lookback window filter shared by all source statements"""
+    return (
+        model.symbol == bindparam("symbol"),
+        model.timestamp >= bindparam("start_time", type_=BigInteger),
+        model.timestamp <= bindparam("current_time_ms", type_=BigInteger),
+    )
+
+
+def _build_trades_buckets_stmt():
+    """Per-bucket taker buy/sell notional sums, shared by CVD and TAKER"""
+    bucket = _bucket_expr(MarketTradesAggregated.timestamp, _INTERVAL_MS)
+    # Sum and cast server-side so rows arrive as native floats, not Decimals
+    buy_sum = func.sum(func.coalesce(MarketTradesAggregated.taker_buy_notional, 0))
+    sell_sum = func.sum(func.coalesce(MarketTradesAggregated.taker_sell_notional, 0))
+
+    return select(
+        bucket,
+        cast(buy_sum, Float).label("buy"),
+        cast(sell_sum, Float).label("sell"),
+        cast(buy_sum - sell_sum, Float).label("delta")
+    ).where(
+        *_source_filter(MarketTradesAggregated)
+    ).group_by(bucket).order_by(bucket).limit(MAX_BUCKETS)
+
+
+def _build_metrics_stmt():
+    """Last asset metric row of each bucket, shared by OI, OI_DELTA and FUNDING"""
+    bucket = _bucket_expr(MarketAssetMetrics.timestamp, _INTERVAL_MS)
+
+    # Cast server-side so rows arrive as native floats, not Decimals
+    return select(
+        MarketAssetMetrics.timestamp,
+        cast(MarketAssetMetrics.open_interest, Float).label("open_interest"),
+        cast(MarketAssetMetrics.funding_rate, Float).label("funding_rate")
+    ).where(
+        *_source_filter(MarketAssetMetrics)
+    ).distinct(bucket).order_by(
+        bucket, MarketAssetMetrics.timestamp.desc()
+    ).limit(MAX_BUCKETS)
+
+
+def _build_orderbook_stmt():
+    """Last order book snapshot of each bucket, shared by DEPTH and IMBALANCE"""
+    bucket = _bucket_expr(MarketOrderbookSnapshots.timestamp, _INTERVAL_MS)
+
+    # Cast server-side so rows arrive as native floats, not Decimals
+    return select(
+        MarketOrderbookSnapshots.timestamp,
+        cast(MarketOrderbookSnapshots.bid_depth_5, Float).label("bid_depth_5"),
+        cast(MarketOrderbookSnapshots.ask_depth_5, Float).label("ask_depth_5"),
+        cast(MarketOrderbookSnapshots.spread, Float).label("spread")
+    ).where(
+        *_source_filter(MarketOrderbookSnapshots)
+    ).distinct(bucket).order_by(
+        bucket, MarketOrderbookSnapshots.timestamp.desc()
+    ).limit(MAX_BUCKETS)
+
+
+_TABLE_STATEMENTS = {
+    "trades": _build_trades_buckets_stmt(),
+    "metrics": _build_metrics_stmt(),
+    "orderbook": _build_orderbook_stmt(),
+}
+
+
+@contextmanager
+def _read_only_snapshot(db: Session) -> Iterator[Connection]:
+    """
+    Open a dedicated read-only REPEATABLE READ transaction for flow queries.
+
+    Uses its own pooled connection so the caller's session transaction is left
+    untouched, and bounds every statement with FLOW_QUERY_TIMEOUT_MS.
+    """
+    with db.get_bind().connect() as conn:
+        conn = conn.execution_options(
+            isolation_level="REPEATABLE READ",
+            postgresql_readonly=True
+        )
+        with conn.begin():
+            conn.execute(text(f"SET LOCAL statement_timeout = {FLOW_QUERY_TIMEOUT_MS}"))
+            yield conn
+
+
+def _query_table(
+    db: Union[Session, Connection], table: str, symbol: str, interval_ms: int, current_time_ms: int
+) -> List[Any]:
+    """Run a source table's statement over the lookback window.
+
+    Every statement buckets in SQL and is capped at MAX_BUCKETS rows, so the
+    result is fetched in one round trip; a server-side cursor would only add
+    extra round trips here.
+    """
+    return db.execute(_TABLE_STATEMENTS[table], {
+        "symbol": symbol,
+        "interval_ms": interval_ms,
+        "start_time": current_time_ms - interval_ms * LOOKBACK_PERIODS,
+        "current_time_ms": current_time_ms,
+    }).all()
+
+
+def _load_rows(
+    db: Session, table: str, symbol: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]]
+) -> List[Any]:
+    """Return prefetched rows for a source table, querying it if not prefetched"""
+    if prefetched is not None and table in prefetched:
+        return prefetched[table]
+    return _query_table(db, table, symbol, interval_ms, current_time_ms)
+
+
+def _trade_arrays(rows: List[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split pre-aggregated trade buckets into (buy, sell, delta) arrays"""
+    count = len(rows)
+    buy = np.fromiter((row.buy for row in rows), dtype=np.float64, count=count)
+    sell = np.fromiter((row.sell for row in rows), dtype=np.float64, count=count)
+    delta = np.fromiter((row.delta for row in rows), dtype=np.float64, count=count)
+    return buy, sell, delta
+
+
+def _load_trade_arrays(
+    db: Session, symbol: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return prefetched trade bucket arrays, building them from the trades rows if not prefetched"""
+    if prefetched is not None and "trade_arrays" in prefetched:
+        return prefetched["trade_arrays"]
+    return _trade_arrays(_load_rows(db, "trades", symbol, interval_ms, current_time_ms, prefetched))
+
+
 def _get_cvd_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get CVD (Cumulative Volume Delta) data.
 
     CVD = Cumulative(Taker Buy Notional - Taker Sell Notional)
     """
-    lookback_ms = interval_ms * 10
+    lookback_ms = interval_ms * LOOKBACK_PERIODS
     start_time = current_time_ms - lookback_ms
 
-    records = db.query(
-        MarketTradesAggregated.timestamp,
-        MarketTradesAggregated.taker_buy_notional,
-        MarketTradesAggregated.taker_sell_notional
-    ).filter(
-        MarketTradesAggregated.symbol == symbol.upper(),
-        MarketTradesAggregated.timestamp >= start_time,
-        MarketTradesAggregated.timestamp <= current_time_ms
-    ).order_by(MarketTradesAggregated.timestamp).all()
+    _, _, deltas = _load_trade_arrays(db, symbol, interval_ms, current_time_ms, prefetched)
 
-    if not records:
-        from datetime import datetime
+    if not deltas.size:
         logger.warning(
             f"CVD insufficient data: symbol={symbol}, period={period}, "
             f"query_range=[{datetime.utcfromtimestamp(start_time/1000)} - "
@@ -228,35 +464,9 @@ def _get_cvd_data(
         )
         return None
 
-    # Aggregate by period
-    buckets = {}
-    for ts, buy_notional, sell_notional in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        if bucket_ts not in buckets:
-            buckets[bucket_ts] = {"buy": Decimal("0"), "sell": Decimal("0")}
-        buckets[bucket_ts]["buy"] += buy_notional or Decimal("0")
-        buckets[bucket_ts]["sell"] += sell_notional or Decimal("0")
-
-    # Calculate CVD for each period
-    sorted_times = sorted(buckets.keys())
-    period_deltas = []
-
-    for ts in sorted_times:
-        bucket = buckets[ts]
-        delta = float(bucket["buy"] - bucket["sell"])
-        period_deltas.append(delta)
-
-    if not period_deltas:
-        from datetime import datetime
-        logger.warning(
-            f"CVD insufficient data: symbol={symbol}, period={period}, "
-            f"records_found={len(records)}, buckets=0"
-        )
-        return None
-
-    last_5 = period_deltas[-5:] if len(period_deltas) >= 5 else period_deltas
-    current_delta = period_deltas[-1]
-    cumulative = sum(period_deltas)
+    last_5 = deltas[-5:].tolist()
+    current_delta = float(deltas[-1])
+    cumulative = float(deltas.sum())
 
     return {
         "current": current_delta,
@@ -267,58 +477,27 @@ def _get_cvd_data(
 
 
 def _get_taker_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get Taker Buy/Sell Volume data.
 
     Returns buy volume, sell volume, and buy/sell ratio.
     """
-    lookback_ms = interval_ms * 10
-    start_time = current_time_ms - lookback_ms
-
-    records = db.query(
-        MarketTradesAggregated.timestamp,
-        MarketTradesAggregated.taker_buy_notional,
-        MarketTradesAggregated.taker_sell_notional
-    ).filter(
-        MarketTradesAggregated.symbol == symbol.upper(),
-        MarketTradesAggregated.timestamp >= start_time,
-        MarketTradesAggregated.timestamp <= current_time_ms
-    ).order_by(MarketTradesAggregated.timestamp).all()
+    buy, sell, _ = _load_trade_arrays(db, symbol, interval_ms, current_time_ms, prefetched)
 
-    if not records:
+    if not buy.size:
         return None
 
-    # Aggregate by period
-    buckets = {}
-    for ts, buy_notional, sell_notional in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        if bucket_ts not in buckets:
-            buckets[bucket_ts] = {"buy": Decimal("0"), "sell": Decimal("0")}
-        buckets[bucket_ts]["buy"] += buy_notional or Decimal("0")
-        buckets[bucket_ts]["sell"] += sell_notional or Decimal("0")
-
-    sorted_times = sorted(buckets.keys())
-    ratios = []
-
-    for ts in sorted_times:
-        bucket = buckets[ts]
-        buy = float(bucket["buy"])
-        sell = float(bucket["sell"])
-        ratio = buy / sell if sell > 0 else 1.0
-        ratios.append(ratio)
-
-    if not ratios:
-        return None
+    ratios = np.divide(buy, sell, out=np.ones_like(buy), where=sell > 0)
 
     # Current period data
-    current_bucket = buckets[sorted_times[-1]]
-    current_buy = float(current_bucket["buy"])
-    current_sell = float(current_bucket["sell"])
-    current_ratio = current_buy / current_sell if current_sell > 0 else 1.0
+    current_buy = float(buy[-1])
+    current_sell = float(sell[-1])
+    current_ratio = float(ratios[-1])
 
-    last_5_ratios = ratios[-5:] if len(ratios) >= 5 else ratios
+    last_5_ratios = ratios[-5:].tolist()
 
     return {
         "buy": current_buy,
@@ -330,27 +509,20 @@ def _get_taker_data(
 
 
 def _get_oi_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get Open Interest absolute value data.
 
     Returns current OI and last 5 values.
     """
-    lookback_ms = interval_ms * 10
+    lookback_ms = interval_ms * LOOKBACK_PERIODS
     start_time = current_time_ms - lookback_ms
 
-    records = db.query(
-        MarketAssetMetrics.timestamp,
-        MarketAssetMetrics.open_interest
-    ).filter(
-        MarketAssetMetrics.symbol == symbol.upper(),
-        MarketAssetMetrics.timestamp >= start_time,
-        MarketAssetMetrics.timestamp <= current_time_ms
-    ).order_by(MarketAssetMetrics.timestamp).all()
+    records = _load_rows(db, "metrics", symbol, interval_ms, current_time_ms, prefetched)
 
     if not records:
-        from datetime import datetime
         logger.warning(
             f"OI insufficient data: symbol={symbol}, period={period}, "
             f"query_range=[{datetime.utcfromtimestamp(start_time/1000)} - "
@@ -358,30 +530,13 @@ def _get_oi_data(
         )
         return None
 
-    # Aggregate by period - take last value in each bucket
-    buckets = {}
-    for ts, oi in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        buckets[bucket_ts] = oi
-
-    sorted_times = sorted(buckets.keys())
-    if not sorted_times:
-        from datetime import datetime
-        logger.warning(
-            f"OI insufficient data: symbol={symbol}, period={period}, "
-            f"records_found={len(records)}, buckets=0"
-        )
-        return None
-
-    # Get OI values
-    oi_values = [decimal_to_float(buckets[ts]) for ts in sorted_times]
-    oi_values = [v for v in oi_values if v is not None]
+    # Records are already the last row of each bucket, in time order
+    oi_values = [r.open_interest for r in records if r.open_interest is not None]
 
     if not oi_values:
-        from datetime import datetime
         logger.warning(
             f"OI insufficient data: symbol={symbol}, period={period}, "
-            f"records_found={len(records)}, buckets={len(sorted_times)}, valid_values=0"
+            f"buckets={len(records)}, valid_values=0"
         )
         return None
 
@@ -396,27 +551,20 @@ def _get_oi_data(
 
 
 def _get_oi_delta_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get Open Interest Delta (change percentage) data.
 
     Returns current OI change % and last 5 changes.
     """
-    lookback_ms = interval_ms * 10
+    lookback_ms = interval_ms * LOOKBACK_PERIODS
     start_time = current_time_ms - lookback_ms
 
-    records = db.query(
-        MarketAssetMetrics.timestamp,
-        MarketAssetMetrics.open_interest
-    ).filter(
-        MarketAssetMetrics.symbol == symbol.upper(),
-        MarketAssetMetrics.timestamp >= start_time,
-        MarketAssetMetrics.timestamp <= current_time_ms
-    ).order_by(MarketAssetMetrics.timestamp).all()
+    records = _load_rows(db, "metrics", symbol, interval_ms, current_time_ms, prefetched)
 
     if not records:
-        from datetime import datetime
         logger.warning(
             f"OI_DELTA insufficient data: symbol={symbol}, period={period}, "
             f"query_range=[{datetime.utcfromtimestamp(start_time/1000)} - "
@@ -424,39 +572,29 @@ def _get_oi_delta_data(
         )
         return None
 
-    # Aggregate by period - take last value in each bucket
-    buckets = {}
-    for ts, oi in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        buckets[bucket_ts] = oi
-
-    sorted_times = sorted(buckets.keys())
-    if len(sorted_times) < 2:
-        from datetime import datetime
+    # Records are already the last row of each bucket, in time order
+    if len(records) < 2:
         logger.warning(
             f"OI_DELTA insufficient data: symbol={symbol}, period={period}, "
-            f"records_found={len(records)}, buckets={len(sorted_times)}, need_min=2"
+            f"buckets={len(records)}, need_min=2"
         )
         return None
 
-    # Calculate OI changes
-    oi_values = [decimal_to_float(buckets[ts]) for ts in sorted_times]
-    oi_changes = []
-    for i in range(1, len(oi_values)):
-        if oi_values[i] and oi_values[i-1] and oi_values[i-1] != 0:
-            change_pct = ((oi_values[i] - oi_values[i-1]) / oi_values[i-1]) * 100
-            oi_changes.append(change_pct)
+    # Calculate OI changes, skipping pairs with a missing or zero value
+    oi_values = _float_array(r.open_interest for r in records)
+    prev_oi, cur_oi = oi_values[:-1], oi_values[1:]
+    valid = (prev_oi != 0) & (cur_oi != 0) & ~np.isnan(prev_oi) & ~np.isnan(cur_oi)
+    oi_changes = np.diff(oi_values)[valid] / prev_oi[valid] * 100
 
-    if not oi_changes:
-        from datetime import datetime
+    if not oi_changes.size:
         logger.warning(
             f"OI_DELTA insufficient data: symbol={symbol}, period={period}, "
-            f"records_found={len(records)}, buckets={len(sorted_times)}, valid_changes=0"
+            f"buckets={len(records)}, valid_changes=0"
         )
         return None
 
-    current_change = oi_changes[-1]
-    last_5 = oi_changes[-5:] if len(oi_changes) >= 5 else oi_changes
+    current_change = float(oi_changes[-1])
+    last_5 = oi_changes[-5:].tolist()
 
     return {
         "current": current_change,
@@ -466,44 +604,22 @@ def _get_oi_delta_data(
 
 
 def _get_funding_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get Funding Rate data.
 
     Returns current funding rate and last 5 values.
     """
-    lookback_ms = interval_ms * 10
-    start_time = current_time_ms - lookback_ms
-
-    records = db.query(
-        MarketAssetMetrics.timestamp,
-        MarketAssetMetrics.funding_rate
-    ).filter(
-        MarketAssetMetrics.symbol == symbol.upper(),
-        MarketAssetMetrics.timestamp >= start_time,
-        MarketAssetMetrics.timestamp <= current_time_ms
-    ).order_by(MarketAssetMetrics.timestamp).all()
+    records = _load_rows(db, "metrics", symbol, interval_ms, current_time_ms, prefetched)
 
     if not records:
         return None
 
-    # Aggregate by period - take last value in each bucket
-    buckets = {}
-    for ts, funding in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        buckets[bucket_ts] = funding
-
-    sorted_times = sorted(buckets.keys())
-    if not sorted_times:
-        return None
-
+    # Records are already the last row of each bucket, in time order.
     # Get funding rate values (convert to percentage)
-    funding_values = []
-    for ts in sorted_times:
-        fr = buckets[ts]
-        if fr is not None:
-            funding_values.append(float(fr) * 100)  # Convert to percentage
+    funding_values = [r.funding_rate * 100 for r in records if r.funding_rate is not None]
 
     if not funding_values:
         return None
@@ -523,60 +639,31 @@ def _get_funding_data(
 
 
 def _get_depth_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get Order Book Depth data.
 
     Returns bid/ask depth ratio and last 5 values.
     """
-    lookback_ms = interval_ms * 10
-    start_time = current_time_ms - lookback_ms
-
-    records = db.query(
-        MarketOrderbookSnapshots.timestamp,
-        MarketOrderbookSnapshots.bid_depth_5,
-        MarketOrderbookSnapshots.ask_depth_5,
-        MarketOrderbookSnapshots.spread
-    ).filter(
-        MarketOrderbookSnapshots.symbol == symbol.upper(),
-        MarketOrderbookSnapshots.timestamp >= start_time,
-        MarketOrderbookSnapshots.timestamp <= current_time_ms
-    ).order_by(MarketOrderbookSnapshots.timestamp).all()
+    records = _load_rows(db, "orderbook", symbol, interval_ms, current_time_ms, prefetched)
 
     if not records:
         return None
 
-    # Aggregate by period - take last value in each bucket
-    buckets = {}
-    for ts, bid_depth, ask_depth, spread in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        buckets[bucket_ts] = {
-            "bid": bid_depth,
-            "ask": ask_depth,
-            "spread": spread
-        }
-
-    sorted_times = sorted(buckets.keys())
-    if not sorted_times:
-        return None
-
+    # Records are already the last snapshot of each bucket, in time order.
     # Calculate depth ratios
-    ratios = []
-    for ts in sorted_times:
-        bucket = buckets[ts]
-        bid = decimal_to_float(bucket["bid"]) or 0
-        ask = decimal_to_float(bucket["ask"]) or 0
-        ratio = bid / ask if ask > 0 else 1.0
-        ratios.append(ratio)
-
-    current_bucket = buckets[sorted_times[-1]]
-    current_bid = decimal_to_float(current_bucket["bid"]) or 0
-    current_ask = decimal_to_float(current_bucket["ask"]) or 0
-    current_ratio = current_bid / current_ask if current_ask > 0 else 1.0
-    current_spread = decimal_to_float(current_bucket["spread"])
-
-    last_5_ratios = ratios[-5:] if len(ratios) >= 5 else ratios
+    bids = np.nan_to_num(_float_array(r.bid_depth_5 for r in records), nan=0.0)
+    asks = np.nan_to_num(_float_array(r.ask_depth_5 for r in records), nan=0.0)
+    ratios = np.divide(bids, asks, out=np.ones_like(bids), where=asks > 0)
+
+    current_bid = float(bids[-1])
+    current_ask = float(asks[-1])
+    current_ratio = float(ratios[-1])
+    current_spread = records[-1].spread
+
+    last_5_ratios = ratios[-5:].tolist()
 
     return {
         "bid": current_bid,
@@ -589,7 +676,8 @@ def _get_depth_data(
 
 
 def _get_imbalance_data(
-    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int
+    db: Session, symbol: str, period: str, interval_ms: int, current_time_ms: int,
+    prefetched: Optional[Dict[str, Any]] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Get Order Book Imbalance data.
@@ -597,47 +685,35 @@ def _get_imbalance_data(
     Imbalance = (Bid - Ask) / (Bid + Ask), range -1 to 1
     Positive = more bid support, Negative = more ask pressure
     """
-    lookback_ms = interval_ms * 10
-    start_time = current_time_ms - lookback_ms
-
-    records = db.query(
-        MarketOrderbookSnapshots.timestamp,
-        MarketOrderbookSnapshots.bid_depth_5,
-        MarketOrderbookSnapshots.ask_depth_5
-    ).filter(
-        MarketOrderbookSnapshots.symbol == symbol.upper(),
-        MarketOrderbookSnapshots.timestamp >= start_time,
-        MarketOrderbookSnapshots.timestamp <= current_time_ms
-    ).order_by(MarketOrderbookSnapshots.timestamp).all()
+    records = _load_rows(db, "orderbook", symbol, interval_ms, current_time_ms, prefetched)
 
     if not records:
         return None
 
-    # Aggregate by period - take last value in each bucket
-    buckets = {}
-    for ts, bid_depth, ask_depth in records:
-        bucket_ts = floor_timestamp(ts, interval_ms)
-        buckets[bucket_ts] = {"bid": bid_depth, "ask": ask_depth}
-
-    sorted_times = sorted(buckets.keys())
-    if not sorted_times:
-        return None
-
+    # Records are already the last snapshot of each bucket, in time order.
     # Calculate imbalance values
-    imbalances = []
-    for ts in sorted_times:
-        bucket = buckets[ts]
-        bid = decimal_to_float(bucket["bid"]) or 0
-        ask = decimal_to_float(bucket["ask"]) or 0
-        total = bid + ask
-        imbalance = (bid - ask) / total if total > 0 else 0.0
-        imbalances.append(imbalance)
-
-    current_imbalance = imbalances[-1]
-    last_5 = imbalances[-5:] if len(imbalances) >= 5 else imbalances
+    bids = np.nan_to_num(_float_array(r.bid_depth_5 for r in records), nan=0.0)
+    asks = np.nan_to_num(_float_array(r.ask_depth_5 for r in records), nan=0.0)
+    totals = bids + asks
+    imbalances = np.divide(bids - asks, totals, out=np.zeros_like(totals), where=totals > 0)
+
+    current_imbalance = float(imbalances[-1])
+    last_5 = imbalances[-5:].tolist()
 
     return {
         "current": current_imbalance,
         "last_5": last_5,
         "period": period
     }
+
+
+# Indicator name -> data helper, shared by both public entry points
+_DISPATCH = {
+    "CVD": _get_cvd_data,
+    "TAKER": _get_taker_data,
+    "OI": _get_oi_data,
+    "OI_DELTA": _get_oi_delta_data,
+    "FUNDING": _get_funding_data,
+    "DEPTH": _get_depth_data,
+    "IMBALANCE": _get_imbalance_data,
+}
@@ -472,7 +472,7 @@ class SignalDetectionService:
 
         db = SessionLocal()
         try:
-            taker_data = _get_taker_data(db, symbol, period, interval_ms, current_time_ms)
+            taker_data = _get_taker_data(db, symbol.upper(), period, interval_ms, current_time_ms)
         finally:
             db.close()
 
@@ -628,7 +628,7 @@ class SignalDetectionService:
 
         db = SessionLocal()
         try:
-            taker_data = _get_taker_data(db, symbol, period, interval_ms, current_time_ms)
+            taker_data = _get_taker_data(db, symbol.upper(), period, interval_ms, current_time_ms)
         finally:
             db.close()
 